@@ -13,8 +13,11 @@
 #  permissions and limitations under the License.
 """Initialization of the whylogs data validator for ZenML."""
 
+from zenml.integrations.whylogs.data_validators.lazy_profile_view import (
+    LazyDatasetProfileView,
+)
 from zenml.integrations.whylogs.data_validators.whylogs_data_validator import (
     WhylogsDataValidator,
 )
 
-__all__ = ["WhylogsDataValidator"]
+__all__ = ["LazyDatasetProfileView", "WhylogsDataValidator"]
@@ -0,0 +1,85 @@
+#  Copyright (c) ZenML GmbH 2023. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at:
+#
+#       https://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+#  or implied. See the License for the specific language governing
+#  permissions and limitations under the License.
+"""Lazily evaluated whylogs dataset profile view."""
+
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+from whylogs.core import DatasetProfileView  # type: ignore
+
+
+class LazyDatasetProfileView:
+    """Whylogs dataset profile view that is only generated when first used.
+
+    Any attribute access is forwarded to the underlying `DatasetProfileView`,
+    which is generated on first access and reused afterwards. Pickling the
+    lazy view also generates the underlying view and pickles it instead.
+    """
+
+    def __init__(self, profile_fn: Callable[[], DatasetProfileView]) -> None:
+        """Initializes the lazy profile view.
+
+        Args:
+            profile_fn: Function that generates the profile view.
+        """
+        self._profile_fn = profile_fn
+        self._realized: Optional[DatasetProfileView] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_realized(self) -> bool:
+        """Whether the underlying profile view was already generated.
+
+        Returns:
+            Whether the underlying profile view was already generated.
+        """
+        return self._realized is not None
+
+    def realize(self) -> DatasetProfileView:
+        """Generates the underlying profile view if necessary and returns it.
+
+        Returns:
+            The underlying profile view.
+        """
+        with self._lock:
+            if self._realized is None:
+                self._realized = self._profile_fn()
+            return self._realized
+
+    def __getattr__(self, name: str) -> Any:
+        """Forwards attribute access to the underlying profile view.
+
+        Args:
+            name: The attribute name.
+
+        Returns:
+            The attribute of the underlying profile view.
+
+        Raises:
+            AttributeError: If the lazy view is not fully initialized.
+        """
+        if name in ("_profile_fn", "_realized", "_lock"):
+            raise AttributeError(name)
+        return getattr(self.realize(), name)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Pickles the underlying profile view instead of the lazy view.
+
+        Returns:
+            The reduced representation of the underlying profile view.
+        """
+        return (
+            DatasetProfileView.deserialize,
+            (self.realize().serialize(),),
+        )
@@ -14,16 +14,36 @@
 """Implementation of the whylogs data validator."""
 
 import datetime
-from typing import Any, ClassVar, Optional, Sequence, Type, cast
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Hashable,
+    Optional,
+    Sequence,
+    Type,
+    cast,
+)
 
+import numpy as np
 import pandas as pd
-import whylogs as why  # type: ignore
+import pkg_resources
 from whylogs.api.writer.whylabs import WhyLabsWriter  # type: ignore
-from whylogs.core import DatasetProfileView  # type: ignore
+from whylogs.core import DatasetProfile, DatasetProfileView  # type: ignore
 
 from zenml.config.base_settings import BaseSettings
 from zenml.data_validators import BaseDataValidator, BaseDataValidatorFlavor
 from zenml.environment import Environment
+from zenml.integrations.whylogs.data_validators.lazy_profile_view import (
+    LazyDatasetProfileView,
+)
 from zenml.integrations.whylogs.flavors.whylogs_data_validator_flavor import (
     WhylogsDataValidatorConfig,
     WhylogsDataValidatorFlavor,
@@ -38,6 +58,373 @@ from zenml.steps import STEP_ENVIRONMENT_NAME, StepEnvironment
 
 logger = get_logger(__name__)
 
+_WHYLABS_WRITER_LOCK = threading.Lock()
+
+# Minimum number of columns for which parallel profiling, if enabled, splits
+# a dataframe across threads. Narrower dataframes are always profiled in a
+# single pass.
+PARALLEL_PROFILING_MIN_COLUMNS = 16
+
+PROFILE_CACHE_SIZE = 128
+_WHYLOGS_VERSION = pkg_resources.get_distribution("whylogs").version
+_PROFILE_CACHE: "OrderedDict[Hashable, DatasetProfileView]" = OrderedDict()
+_PROFILE_CACHE_LOCK = threading.Lock()
+
+
+def _dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """Compute a fingerprint of the content of a pandas dataframe.
+
+    The fingerprint covers the column names, the column dtypes and the values
+    (including the index) of the dataframe.
+
+    Args:
+        df: The dataframe to fingerprint.
+
+    Returns:
+        A hex digest identifying the dataframe content.
+
+    Raises:
+        TypeError: If the dataframe has an object column that doesn't only
+            contain strings. Pandas hashes the string representation of such
+            values, so e.g. `1` and `"1"` would get the same fingerprint.
+    """
+    for column, values in df.items():
+        if values.dtype == object and pd.api.types.infer_dtype(
+            values, skipna=True
+        ) not in ("string", "empty"):
+            raise TypeError(
+                f"Column {column!r} contains values that are not strings."
+            )
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(repr(list(df.dtypes.astype(str))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=32)
+def _make_whylabs_writer(
+    org_id: Optional[str], api_key: str, dataset_id: str
+) -> WhyLabsWriter:
+    """Create a WhyLabs writer for the given credentials and dataset.
+
+    Writers are cached per (organization, API key, dataset) so that repeated
+    uploads from the same pipeline step do not re-create the writer and its
+    API client configuration every time.
+
+    Args:
+        org_id: The Whylabs organization ID.
+        api_key: The Whylabs API key.
+        dataset_id: The Whylabs dataset ID.
+
+    Returns:
+        A WhyLabs writer instance.
+    """
+    return WhyLabsWriter(
+        org_id=org_id,
+        api_key=api_key,
+        dataset_id=dataset_id,
+    )
+
+
+def _get_cached_profile_view(key: Hashable) -> Optional[DatasetProfileView]:
+    """Get a profile view from the in-memory profile cache.
+
+    Args:
+        key: The cache key.
+
+    Returns:
+        The cached profile view, if one exists for the given key.
+    """
+    with _PROFILE_CACHE_LOCK:
+        profile_view = _PROFILE_CACHE.get(key)
+        if profile_view is not None:
+            _PROFILE_CACHE.move_to_end(key)
+        return profile_view
+
+
+def _cache_profile_view(
+    key: Hashable, profile_view: DatasetProfileView
+) -> None:
+    """Store a profile view in the in-memory profile cache.
+
+    The least recently used profile views are evicted once the cache holds
+    more than `PROFILE_CACHE_SIZE` entries.
+
+    Args:
+        key: The cache key.
+        profile_view: The profile view to cache.
+    """
+    with _PROFILE_CACHE_LOCK:
+        _PROFILE_CACHE[key] = profile_view
+        _PROFILE_CACHE.move_to_end(key)
+        while len(_PROFILE_CACHE) > PROFILE_CACHE_SIZE:
+            _PROFILE_CACHE.popitem(last=False)
+
+
+def _with_current_timestamp(
+    profile_view: DatasetProfileView,
+    dataset_timestamp: Optional[datetime.datetime],
+) -> DatasetProfileView:
+    """Stamp a cached profile view with the current time if needed.
+
+    Cached profiles generated without an explicit dataset timestamp carry the
+    time at which they were generated. They are returned with the current
+    time instead, as if they had been generated again.
+
+    Args:
+        profile_view: The cached profile view.
+        dataset_timestamp: The dataset timestamp requested by the caller.
+
+    Returns:
+        The profile view to return to the caller.
+    """
+    if dataset_timestamp is not None:
+        return profile_view
+
+    return DatasetProfileView(
+        columns=profile_view.get_columns(),
+        dataset_timestamp=datetime.datetime.now(datetime.timezone.utc),
+        creation_timestamp=profile_view.creation_timestamp,
+    )
+
+
+def _get_profile_cache_path(cache_dir: str, key: Hashable) -> str:
+    """Get the path of the file in which a profile view is persisted.
+
+    The path also depends on the installed whylogs version, so that profiles
+    persisted by a different whylogs release are never read.
+
+    Args:
+        cache_dir: The profile cache directory.
+        key: The cache key.
+
+    Returns:
+        The path of the profile view file.
+    """
+    digest = hashlib.blake2b(
+        repr((_WHYLOGS_VERSION, key)).encode(), digest_size=16
+    )
+    return os.path.join(cache_dir, f"{digest.hexdigest()}.bin")
+
+
+def _read_profile_view_from_disk(
+    cache_dir: str, key: Hashable
+) -> Optional[DatasetProfileView]:
+    """Read a profile view from an on-disk profile cache.
+
+    Args:
+        cache_dir: The profile cache directory.
+        key: The cache key.
+
+    Returns:
+        The persisted profile view, if one exists for the given key and can
+        be read.
+    """
+    path = _get_profile_cache_path(cache_dir, key)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            return DatasetProfileView.deserialize(f.read())
+    except Exception as e:
+        logger.warning(
+            "Failed to read cached whylogs profile view from %s: %s", path, e
+        )
+        return None
+
+
+def _write_profile_view_to_disk(
+    cache_dir: str, key: Hashable, profile_view: DatasetProfileView
+) -> None:
+    """Persist a profile view in an on-disk profile cache.
+
+    The profile view is first written to a temporary file which then replaces
+    the target file, so that concurrent readers never see a partial file.
+
+    Args:
+        cache_dir: The profile cache directory.
+        key: The cache key.
+        profile_view: The profile view to persist.
+    """
+    path = _get_profile_cache_path(cache_dir, key)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(profile_view.serialize())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    except Exception as e:
+        logger.warning(
+            "Failed to write cached whylogs profile view to %s: %s", path, e
+        )
+
+
+def _downcast_numeric_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcast the 64-bit numeric columns of a dataframe.
+
+    `float64` columns are converted to `float32`, unless one of their finite
+    values is outside of the `float32` range (which would turn it into an
+    infinite value). `int64` columns are converted to the smallest integer
+    dtype that can hold their values. The other columns are shared with the
+    original dataframe, which is left unchanged.
+
+    Args:
+        df: The dataframe to downcast.
+
+    Returns:
+        The dataframe with downcasted numeric columns.
+    """
+    if not df.columns.is_unique:
+        return df
+
+    float32_info = np.finfo(np.float32)
+    downcasted_columns: Dict[Hashable, pd.Series] = {}
+    for column in df.select_dtypes(include="float64").columns:
+        values = df[column].to_numpy()
+        finite_values = values[np.isfinite(values)]
+        if finite_values.size and (
+            finite_values.min() < float32_info.min
+            or finite_values.max() > float32_info.max
+        ):
+            continue
+        downcasted_columns[column] = df[column].astype(np.float32)
+    downcasted_columns.update(
+        {
+            column: pd.to_numeric(df[column], downcast="integer")
+            for column in df.select_dtypes(include="int64").columns
+        }
+    )
+    if not downcasted_columns:
+        return df
+
+    df = df.copy(deep=False)
+    for column, values in downcasted_columns.items():
+        df[column] = values
+    return df
+
+
+def _profile_columns(
+    df: pd.DataFrame, dataset_timestamp: datetime.datetime
+) -> DatasetProfileView:
+    """Profile a pandas dataframe with whylogs.
+
+    Args:
+        df: The dataframe to profile.
+        dataset_timestamp: The timestamp to associate with the profile.
+
+    Returns:
+        A whylogs profile view for the dataframe.
+    """
+    profile = DatasetProfile()
+    profile.track(pandas=df)
+    profile.set_dataset_timestamp(dataset_timestamp=dataset_timestamp)
+    return profile.view()
+
+
+def _get_column_frame(df: pd.DataFrame, column: Hashable) -> pd.DataFrame:
+    """Get a single-column dataframe for one column of a dataframe.
+
+    NumPy-backed numeric columns are exposed as contiguous arrays, which are
+    scanned linearly by the whylogs metric updates. Other columns are passed
+    through unchanged. In both cases, the column data is only copied if the
+    original array is not contiguous, unlike with `df[[column]]`.
+
+    Args:
+        df: The dataframe.
+        column: The column name.
+
+    Returns:
+        A dataframe that only contains the given column.
+    """
+    series = df[column]
+    if isinstance(series.dtype, np.dtype) and pd.api.types.is_numeric_dtype(
+        series.dtype
+    ):
+        series = pd.Series(
+            np.ascontiguousarray(series.to_numpy()),
+            index=series.index,
+            name=column,
+            copy=False,
+        )
+    return series.to_frame()
+
+
+def _profile_dataframe(
+    df: pd.DataFrame,
+    dataset_timestamp: datetime.datetime,
+    parallel: bool = False,
+) -> DatasetProfileView:
+    """Profile a pandas dataframe with whylogs.
+
+    The statistics of every column are independent of each other, so if
+    `parallel` is set, dataframes with at least
+    `PARALLEL_PROFILING_MIN_COLUMNS` columns are split into single-column
+    dataframes that are profiled concurrently, and
+    the resulting column views are combined into a single profile view that
+    keeps the column order of the dataframe. The single-column dataframes are
+    built on top of the original column data (see `_get_column_frame`).
+    Columns are scheduled grouped by dtype, numeric columns first, so that
+    columns sharing the same whylogs code path are profiled together.
+
+    Args:
+        df: The dataframe to profile.
+        dataset_timestamp: The timestamp to associate with the profile.
+        parallel: Whether to profile the columns of wide dataframes
+            concurrently.
+
+    Returns:
+        A whylogs profile view for the dataframe.
+    """
+    if (
+        not parallel
+        or len(df.columns) < PARALLEL_PROFILING_MIN_COLUMNS
+        or not df.columns.is_unique
+    ):
+        return _profile_columns(df, dataset_timestamp)
+
+    dtypes = df.dtypes
+    columns = sorted(
+        df.columns,
+        key=lambda column: (
+            not pd.api.types.is_numeric_dtype(dtypes[column]),
+            str(dtypes[column]),
+        ),
+    )
+
+    max_workers = min(len(columns), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        views = dict(
+            zip(
+                columns,
+                executor.map(
+                    lambda column: _profile_columns(
+                        _get_column_frame(df, column), dataset_timestamp
+                    ),
+                    columns,
+                ),
+            )
+        )
+
+    # `DatasetProfileView.merge` does not preserve the column order, so the
+    # column views are combined in the order of the dataframe instead
+    column_views: Dict[str, Any] = {}
+    for column in df.columns:
+        column_views.update(views[column].get_columns())
+    # the per-column views carry the timestamp as normalized by whylogs
+    first_view = views[columns[0]]
+    return DatasetProfileView(
+        columns=column_views,
+        dataset_timestamp=first_view.dataset_timestamp,
+        creation_timestamp=first_view.creation_timestamp,
+    )
+
 
 class WhylogsDataValidator(BaseDataValidator, AuthenticationMixin):
     """Whylogs data validator stack component.
@@ -78,10 +465,23 @@ class WhylogsDataValidator(BaseDataValidator, AuthenticationMixin):
         comparison_dataset: Optional[pd.DataFrame] = None,
         profile_list: Optional[Sequence[str]] = None,
         dataset_timestamp: Optional[datetime.datetime] = None,
+        enable_profile_cache: bool = False,
+        low_precision: bool = False,
+        sample_size: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        parallel_profiling: bool = False,
         **kwargs: Any,
     ) -> DatasetProfileView:
         """Analyze a dataset and generate a data profile with whylogs.
 
+        If `enable_profile_cache` is set, the generated profile is cached in
+        memory, keyed by the content of the dataset and the dataset timestamp,
+        and returned as-is when the same dataset is profiled again. If a
+        `cache_dir` is supplied, profiles are additionally persisted in that
+        local directory, so they can be reused across processes (e.g. when a
+        pipeline is run again). In both cases, the dataset must not be modified
+        in-place between profiling calls.
+
         Args:
             dataset: Target dataset to be profiled.
             comparison_dataset: Optional dataset to be used for data profiles
@@ -90,17 +490,133 @@ class WhylogsDataValidator(BaseDataValidator, AuthenticationMixin):
                 data profiles to be generated (unused).
             dataset_timestamp: timestamp to associate with the generated
                 dataset profile (Optional). The current time is used if not
-                supplied.
+                supplied, also for profiles returned from a cache.
+            enable_profile_cache: Whether to reuse profiles previously
+                generated in this process for identical datasets.
+            low_precision: Whether to downcast `float64` and `int64` columns
+                to narrower dtypes before profiling them. This adds a
+                conversion pass and is not guaranteed to make profiling
+                faster, as whylogs may convert the values back to double
+                precision internally. Integer columns are downcast
+                losslessly. Float values are rounded to `float32`
+                precision (about 7 significant digits, so e.g. large integers
+                stored as floats are rounded and values smaller than about
+                1e-38 lose precision or become zero), which affects the
+                computed statistics accordingly. Float columns with finite
+                values outside of the `float32` range are not downcast.
+            sample_size: Optional maximum number of rows to profile. Datasets
+                with more rows are profiled based on a uniform random sample
+                (without replacement) of this many rows, which bounds the
+                profiling cost at the expense of the accuracy of the profile.
+            cache_dir: Optional local directory in which to persist generated
+                profiles and look up previously generated ones. Files in this
+                directory are never removed by ZenML, so the caller is
+                responsible for cleaning it up.
+            parallel_profiling: Whether to profile the columns of datasets
+                with at least `PARALLEL_PROFILING_MIN_COLUMNS` columns in
+                multiple threads. Whether this is faster than profiling them
+                in a single pass depends on the dataset, so it is disabled by
+                default.
             **kwargs: Extra keyword arguments (unused).
 
         Returns:
             A whylogs profile view object.
+
+        Raises:
+            ValueError: If `sample_size` is smaller than 1.
+        """
+        if sample_size is not None and sample_size < 1:
+            raise ValueError(
+                f"Invalid sample size {sample_size}: the sample size must be "
+                "at least 1."
+            )
+
+        # look up the cache before doing any other work so that cache hits
+        # only cost the fingerprint computation
+        cache_key: Optional[Hashable] = None
+        if enable_profile_cache or cache_dir:
+            try:
+                fingerprint = _dataframe_fingerprint(dataset)
+            except TypeError as e:
+                # e.g. object columns holding lists or dicts
+                logger.debug(
+                    "Not caching the whylogs profile because the dataset "
+                    "cannot be fingerprinted: %s",
+                    e,
+                )
+                enable_profile_cache = False
+                cache_dir = None
+            else:
+                cache_key = (
+                    fingerprint,
+                    dataset_timestamp,
+                    low_precision,
+                    sample_size,
+                )
+        if enable_profile_cache:
+            cached_view = _get_cached_profile_view(cache_key)
+            if cached_view is not None:
+                return _with_current_timestamp(cached_view, dataset_timestamp)
+        if cache_dir:
+            cached_view = _read_profile_view_from_disk(cache_dir, cache_key)
+            if cached_view is not None:
+                if enable_profile_cache:
+                    _cache_profile_view(cache_key, cached_view)
+                return _with_current_timestamp(cached_view, dataset_timestamp)
+
+        if sample_size is not None and len(dataset) > sample_size:
+            dataset = dataset.sample(n=sample_size, random_state=0)
+
+        if low_precision:
+            dataset = _downcast_numeric_columns(dataset)
+
+        # track the dataset directly into profiles instead of going through
+        # `why.log`, which sets up a transient logger and a result set that
+        # are not needed here
+        profile_view = _profile_dataframe(
+            dataset,
+            dataset_timestamp=dataset_timestamp
+            or datetime.datetime.now(datetime.timezone.utc),
+            parallel=parallel_profiling,
+        )
+
+        if enable_profile_cache:
+            _cache_profile_view(cache_key, profile_view)
+        if cache_dir:
+            _write_profile_view_to_disk(cache_dir, cache_key, profile_view)
+
+        return profile_view
+
+    def lazy_data_profiling(
+        self,
+        dataset: pd.DataFrame,
+        dataset_timestamp: Optional[datetime.datetime] = None,
+        **kwargs: Any,
+    ) -> LazyDatasetProfileView:
+        """Prepare a whylogs data profile that is only generated when used.
+
+        The profile is generated with `data_profiling` on first access of any
+        of its attributes, or when it is serialized. The dataset must not be
+        modified in-place before that happens.
+
+        Args:
+            dataset: Target dataset to be profiled.
+            dataset_timestamp: timestamp to associate with the generated
+                dataset profile (Optional). The time at which the profile is
+                generated is used if not supplied.
+            **kwargs: Extra keyword arguments passed to `data_profiling`.
+
+        Returns:
+            A lazily evaluated whylogs profile view object.
         """
-        results = why.log(pandas=dataset)
-        profile = results.profile()
-        dataset_timestamp = dataset_timestamp or datetime.datetime.utcnow()
-        profile.set_dataset_timestamp(dataset_timestamp=dataset_timestamp)
-        return profile.view()
+        return LazyDatasetProfileView(
+            functools.partial(
+                self.data_profiling,
+                dataset,
+                dataset_timestamp=dataset_timestamp,
+                **kwargs,
+            )
+        )
 
     def upload_profile_view(
         self,
@@ -146,12 +662,14 @@ class WhylogsDataValidator(BaseDataValidator, AuthenticationMixin):
                     "generated from the current pipeline and step name."
                 )
 
-        # Instantiate WhyLabs Writer
-        writer = WhyLabsWriter(
-            org_id=secret.whylabs_default_org_id,
-            api_key=secret.whylabs_api_key,
-            dataset_id=dataset_id,
-        )
+        # Get a (possibly cached) WhyLabs Writer. Steps may run concurrently,
+        # so the lookup is guarded to avoid creating duplicate writers.
+        with _WHYLABS_WRITER_LOCK:
+            writer = _make_whylabs_writer(
+                org_id=secret.whylabs_default_org_id,
+                api_key=secret.whylabs_api_key,
+                dataset_id=dataset_id,
+            )
 
         # pass a profile view to the writer's write method
         writer.write(profile=profile_view)
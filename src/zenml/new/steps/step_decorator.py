@@ -46,6 +46,68 @@ if TYPE_CHECKING:
     F = TypeVar("F", bound=Callable[..., Any])
 
 
+# Resolved on first use: importing `_DecoratedStep` at module level would
+# import `zenml.steps` whenever `zenml` is imported.
+_DECORATED_STEP_CLASS: Optional[Type["BaseStep"]] = None
+
+
+def _get_decorated_step_class() -> Type["BaseStep"]:
+    """Gets the base class for steps created by the step decorator.
+
+    Returns:
+        The `_DecoratedStep` class.
+    """
+    global _DECORATED_STEP_CLASS
+    if _DECORATED_STEP_CLASS is None:
+        from zenml.new.steps.decorated_step import _DecoratedStep
+
+        _DECORATED_STEP_CLASS = _DecoratedStep
+    return _DECORATED_STEP_CLASS
+
+
+# Attribute of a decorated function that stores its step class
+_STEP_CLASS_ATTRIBUTE = "_zenml_step_class"
+
+
+def _get_step_class(func: "F") -> Type["BaseStep"]:
+    """Gets the step class for a function decorated with `@step`.
+
+    The class only depends on the decorated function, so it is created once
+    per function and reused if the same function is decorated again. The
+    class is stored on the function itself, so that both can be garbage
+    collected together once they are no longer used.
+
+    Args:
+        func: The decorated function.
+
+    Returns:
+        The step class.
+    """
+    step_class: Optional[Type["BaseStep"]] = getattr(
+        func, _STEP_CLASS_ATTRIBUTE, None
+    )
+    # `functools.wraps` copies the attribute to wrappers of a decorated
+    # function, so make sure the class was created for this function
+    if step_class is not None and step_class.entrypoint is func:
+        return step_class
+
+    step_class = type(
+        func.__name__,
+        (_get_decorated_step_class(),),
+        {
+            "entrypoint": staticmethod(func),
+            "__module__": func.__module__,
+            "__doc__": func.__doc__,
+        },
+    )
+    try:
+        setattr(func, _STEP_CLASS_ATTRIBUTE, step_class)
+    except AttributeError:
+        # e.g. bound methods, which don't support setting attributes
+        pass
+    return step_class
+
+
 @overload
 def step(_func: "F") -> "BaseStep":
     ...
@@ -122,19 +184,7 @@ def step(
     """
 
     def inner_decorator(func: "F") -> "BaseStep":
-        from zenml.new.steps.decorated_step import _DecoratedStep
-
-        class_: Type["BaseStep"] = type(
-            func.__name__,
-            (_DecoratedStep,),
-            {
-                "entrypoint": staticmethod(func),
-                "__module__": func.__module__,
-                "__doc__": func.__doc__,
-            },
-        )
-
-        step_instance = class_(
+        return _get_step_class(func)(
             name=name or func.__name__,
             enable_cache=enable_cache,
             enable_artifact_metadata=enable_artifact_metadata,
@@ -148,8 +198,6 @@ def step(
             on_success=on_success,
         )
 
-        return step_instance
-
     if _func is None:
         return inner_decorator
     else:
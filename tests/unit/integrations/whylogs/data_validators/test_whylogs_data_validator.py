@@ -0,0 +1,372 @@
+#  Copyright (c) ZenML GmbH 2023. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at:
+#
+#       https://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+#  or implied. See the License for the specific language governing
+#  permissions and limitations under the License.
+
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+import pytest
+from whylogs.core import DatasetProfile
+
+from zenml.enums import StackComponentType
+from zenml.integrations.whylogs.data_validators import WhylogsDataValidator
+from zenml.integrations.whylogs.data_validators.whylogs_data_validator import (
+    _PROFILE_CACHE,
+    PARALLEL_PROFILING_MIN_COLUMNS,
+    _downcast_numeric_columns,
+    _make_whylabs_writer,
+)
+from zenml.integrations.whylogs.secret_schemas.whylabs_secret_schema import (
+    WhylabsSecretSchema,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_profile_cache():
+    """Clears the in-memory whylogs profile cache around each test."""
+    _PROFILE_CACHE.clear()
+    yield
+    _PROFILE_CACHE.clear()
+
+
+def _get_whylogs_data_validator() -> WhylogsDataValidator:
+    """Creates a whylogs data validator for testing."""
+    return WhylogsDataValidator(
+        name="whylogs_validator",
+        id=uuid4(),
+        config={},
+        flavor="whylogs",
+        type=StackComponentType.DATA_VALIDATOR,
+        user=uuid4(),
+        workspace=uuid4(),
+        created=datetime.now(),
+        updated=datetime.now(),
+    )
+
+
+def test_whylogs_data_profiling_cache():
+    """Tests that cached profiles are reused only for identical datasets."""
+    validator = _get_whylogs_data_validator()
+    dataset = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    dataset_timestamp = datetime(2023, 1, 1)
+
+    profile_view = validator.data_profiling(
+        dataset,
+        dataset_timestamp=dataset_timestamp,
+        enable_profile_cache=True,
+    )
+    assert (
+        validator.data_profiling(
+            dataset.copy(),
+            dataset_timestamp=dataset_timestamp,
+            enable_profile_cache=True,
+        )
+        is profile_view
+    )
+    assert (
+        validator.data_profiling(dataset, dataset_timestamp=dataset_timestamp)
+        is not profile_view
+    )
+
+    renamed_dataset = dataset.rename(columns={"a": "c"})
+    assert (
+        validator.data_profiling(
+            renamed_dataset,
+            dataset_timestamp=dataset_timestamp,
+            enable_profile_cache=True,
+        )
+        is not profile_view
+    )
+
+
+def _get_outdated_profile_view(dataset: pd.DataFrame):
+    """Profiles a dataset with a dataset timestamp far in the past."""
+    profile = DatasetProfile()
+    profile.track(pandas=dataset)
+    profile.set_dataset_timestamp(
+        dataset_timestamp=datetime(2000, 1, 1, tzinfo=timezone.utc)
+    )
+    return profile.view()
+
+
+def test_whylogs_data_profiling_cache_hit_uses_current_timestamp(mocker):
+    """Tests that cached profiles without a timestamp get the current time."""
+    validator = _get_whylogs_data_validator()
+    dataset = pd.DataFrame({"a": [1, 2, 3]})
+
+    # the cached profile is stamped with a time far in the past, so the test
+    # doesn't depend on the clock advancing between the two calls
+    mock_profile_dataframe = mocker.patch(
+        "zenml.integrations.whylogs.data_validators.whylogs_data_validator._profile_dataframe",
+        return_value=_get_outdated_profile_view(dataset),
+    )
+    profile_view = validator.data_profiling(dataset, enable_profile_cache=True)
+    call_time = datetime.now(timezone.utc)
+    cached_view = validator.data_profiling(dataset, enable_profile_cache=True)
+
+    mock_profile_dataframe.assert_called_once()
+    assert cached_view.get_columns() == profile_view.get_columns()
+    assert cached_view.dataset_timestamp >= call_time
+
+
+def test_whylogs_data_profiling_cache_distinguishes_value_types():
+    """Tests that object columns with equal string representations but
+    different value types don't share a cached profile."""
+    validator = _get_whylogs_data_validator()
+    dataset_timestamp = datetime(2023, 1, 1)
+    int_dataset = pd.DataFrame({"a": pd.Series([1, 2], dtype=object)})
+    str_dataset = pd.DataFrame({"a": ["1", "2"]})
+
+    int_view = validator.data_profiling(
+        int_dataset,
+        dataset_timestamp=dataset_timestamp,
+        enable_profile_cache=True,
+    )
+    str_view = validator.data_profiling(
+        str_dataset,
+        dataset_timestamp=dataset_timestamp,
+        enable_profile_cache=True,
+    )
+
+    assert str_view is not int_view
+    int_types = int_view.get_column("a").get_metric("types")
+    str_types = str_view.get_column("a").get_metric("types")
+    assert int_types.integral.value == 2
+    assert str_types.string.value == 2
+    assert str_types.integral.value == 0
+
+
+def test_whylogs_data_profiling_profiles_all_columns():
+    """Tests that wide datasets are profiled like in a single pass."""
+    validator = _get_whylogs_data_validator()
+    num_columns = PARALLEL_PROFILING_MIN_COLUMNS + 4
+    dataset = pd.DataFrame(
+        {
+            f"col_{i}": (
+                [str(i * j) for j in range(10)]
+                if i % 3 == 0
+                else [float(i * j) for j in range(10)]
+            )
+            for i in range(num_columns)
+        }
+    )
+
+    summary = validator.data_profiling(
+        dataset, parallel_profiling=True
+    ).to_pandas()
+
+    expected_profile = DatasetProfile()
+    expected_profile.track(pandas=dataset)
+    expected_summary = expected_profile.view().to_pandas()
+
+    assert list(summary.index) == list(dataset.columns)
+    for metric in ["counts/n", "distribution/min", "distribution/max"]:
+        pd.testing.assert_series_equal(
+            summary[metric], expected_summary.loc[summary.index, metric]
+        )
+
+
+def test_whylogs_parallel_profiling_normalizes_the_timestamp():
+    """Tests that narrow and wide datasets get the same dataset timestamp."""
+    validator = _get_whylogs_data_validator()
+    dataset_timestamp = datetime(2023, 1, 1)
+    narrow_dataset = pd.DataFrame({"a": range(10)})
+    wide_dataset = pd.DataFrame(
+        {f"col_{i}": range(10) for i in range(PARALLEL_PROFILING_MIN_COLUMNS)}
+    )
+
+    narrow_view = validator.data_profiling(
+        narrow_dataset,
+        dataset_timestamp=dataset_timestamp,
+        parallel_profiling=True,
+    )
+    wide_view = validator.data_profiling(
+        wide_dataset,
+        dataset_timestamp=dataset_timestamp,
+        parallel_profiling=True,
+    )
+
+    assert wide_view.dataset_timestamp == narrow_view.dataset_timestamp
+    assert wide_view.dataset_timestamp.tzinfo is not None
+
+
+def test_whylogs_lazy_data_profiling():
+    """Tests that lazy profiles are only generated when accessed."""
+    validator = _get_whylogs_data_validator()
+    dataset = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+
+    lazy_view = validator.lazy_data_profiling(dataset)
+    assert not lazy_view.is_realized
+
+    assert set(lazy_view.get_columns()) == {"a", "b"}
+    assert lazy_view.is_realized
+    assert lazy_view.realize() is lazy_view.realize()
+
+
+def test_whylogs_data_profiling_cache_hit_skips_profiling(mocker):
+    """Tests that cache hits do not profile the dataset again."""
+    validator = _get_whylogs_data_validator()
+    dataset = pd.DataFrame({"a": [4, 5, 6]})
+    dataset_timestamp = datetime(2023, 1, 1)
+    profile_view = validator.data_profiling(
+        dataset,
+        dataset_timestamp=dataset_timestamp,
+        enable_profile_cache=True,
+    )
+
+    mock_profile_dataframe = mocker.patch(
+        "zenml.integrations.whylogs.data_validators.whylogs_data_validator._profile_dataframe",
+    )
+    assert (
+        validator.data_profiling(
+            dataset,
+            dataset_timestamp=dataset_timestamp,
+            enable_profile_cache=True,
+        )
+        is profile_view
+    )
+    mock_profile_dataframe.assert_not_called()
+
+
+def test_whylogs_data_profiling_low_precision():
+    """Tests that low precision profiling leaves the dataset unchanged."""
+    validator = _get_whylogs_data_validator()
+    dataset = pd.DataFrame(
+        {"a": [1, 2, 3], "b": [0.5, 1.5, 2.5], "c": ["x", "y", "z"]}
+    )
+    dtypes = dataset.dtypes.copy()
+
+    profile_view = validator.data_profiling(dataset, low_precision=True)
+
+    assert set(profile_view.get_columns()) == {"a", "b", "c"}
+    assert dataset.dtypes.equals(dtypes)
+
+
+def test_whylogs_data_profiling_sample_size():
+    """Tests that only a sample of the rows is profiled for large datasets."""
+    validator = _get_whylogs_data_validator()
+    dataset = pd.DataFrame({"a": range(100)})
+
+    profile_view = validator.data_profiling(dataset, sample_size=10)
+
+    column_view = profile_view.get_column("a")
+    assert column_view.get_metric("counts").n.value == 10
+
+    for invalid_sample_size in [0, -1]:
+        with pytest.raises(ValueError):
+            validator.data_profiling(dataset, sample_size=invalid_sample_size)
+
+
+def test_whylogs_data_profiling_disk_cache(tmp_path, mocker):
+    """Tests that profiles persisted on disk are reused."""
+    validator = _get_whylogs_data_validator()
+    dataset = pd.DataFrame({"a": [7, 8, 9]})
+    dataset_timestamp = datetime(2023, 1, 1)
+
+    profile_view = validator.data_profiling(
+        dataset,
+        dataset_timestamp=dataset_timestamp,
+        cache_dir=str(tmp_path),
+    )
+    assert len(list(tmp_path.glob("*.bin"))) == 1
+
+    mock_profile_dataframe = mocker.patch(
+        "zenml.integrations.whylogs.data_validators.whylogs_data_validator._profile_dataframe",
+    )
+    cached_view = validator.data_profiling(
+        dataset,
+        dataset_timestamp=dataset_timestamp,
+        cache_dir=str(tmp_path),
+    )
+    mock_profile_dataframe.assert_not_called()
+    assert cached_view.serialize() == profile_view.serialize()
+
+
+def test_whylabs_writers_are_reused_per_dataset(mocker):
+    """Tests that WhyLabs writers are reused only for the same dataset."""
+    validator = _get_whylogs_data_validator()
+    mocker.patch.object(
+        WhylogsDataValidator,
+        "get_authentication_secret",
+        return_value=WhylabsSecretSchema(
+            name="whylabs_secret",
+            whylabs_default_org_id="org",
+            whylabs_api_key="key",
+        ),
+    )
+    mock_writer_class = mocker.patch(
+        "zenml.integrations.whylogs.data_validators.whylogs_data_validator.WhyLabsWriter",
+    )
+    _make_whylabs_writer.cache_clear()
+
+    profile_view = mocker.MagicMock()
+    validator.upload_profile_view(profile_view, dataset_id="dataset_1")
+    validator.upload_profile_view(profile_view, dataset_id="dataset_1")
+    assert mock_writer_class.call_count == 1
+
+    validator.upload_profile_view(profile_view, dataset_id="dataset_2")
+    assert mock_writer_class.call_count == 2
+    assert {
+        call.kwargs["dataset_id"] for call in mock_writer_class.call_args_list
+    } == {"dataset_1", "dataset_2"}
+    assert mock_writer_class.return_value.write.call_count == 3
+
+    _make_whylabs_writer.cache_clear()
+
+
+def test_whylogs_data_profiling_cache_skips_unhashable_datasets(tmp_path):
+    """Tests that datasets that cannot be fingerprinted are not cached."""
+    validator = _get_whylogs_data_validator()
+    dataset = pd.DataFrame({"a": [[1, 2], [3]], "b": [{"x": 1}, {"y": 2}]})
+
+    profile_view = validator.data_profiling(
+        dataset, enable_profile_cache=True, cache_dir=str(tmp_path)
+    )
+
+    assert set(profile_view.get_columns()) == {"a", "b"}
+    assert len(_PROFILE_CACHE) == 0
+    assert not list(tmp_path.glob("*.bin"))
+
+
+def test_whylogs_low_precision_keeps_out_of_range_floats():
+    """Tests that floats outside of the float32 range are not downcast."""
+    dataset = pd.DataFrame({"small": [0.5, 1.5], "large": [1.0, 1e300]})
+
+    downcasted_dataset = _downcast_numeric_columns(dataset)
+
+    assert downcasted_dataset["small"].dtype == np.float32
+    assert downcasted_dataset["large"].dtype == np.float64
+    assert np.isfinite(downcasted_dataset["large"]).all()
+
+
+def test_whylogs_data_profiling_disk_cache_hit_uses_current_timestamp(
+    tmp_path, mocker
+):
+    """Tests that persisted profiles without a timestamp get the current
+    time."""
+    validator = _get_whylogs_data_validator()
+    dataset = pd.DataFrame({"a": [1, 2, 3]})
+
+    mock_profile_dataframe = mocker.patch(
+        "zenml.integrations.whylogs.data_validators.whylogs_data_validator._profile_dataframe",
+        return_value=_get_outdated_profile_view(dataset),
+    )
+    profile_view = validator.data_profiling(dataset, cache_dir=str(tmp_path))
+    call_time = datetime.now(timezone.utc)
+    cached_view = validator.data_profiling(dataset, cache_dir=str(tmp_path))
+
+    mock_profile_dataframe.assert_called_once()
+    assert set(cached_view.get_columns()) == set(profile_view.get_columns())
+    assert cached_view.dataset_timestamp >= call_time
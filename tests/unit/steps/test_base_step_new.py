@@ -11,6 +11,8 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
 #  or implied. See the License for the specific language governing
 #  permissions and limitations under the License.
+import gc
+import weakref
 from contextlib import ExitStack as does_not_raise
 from typing import Dict, List, Tuple
 
@@ -98,3 +100,47 @@ def test_passing_valid_parameters():
 
     with does_not_raise():
         test_pipeline()
+
+
+def test_step_class_is_reused_for_the_same_function():
+    """Tests that decorating a function twice reuses the step class."""
+
+    def some_function() -> int:
+        return 1
+
+    first_step = step(some_function)
+    second_step = step(name="other_name")(some_function)
+
+    assert type(first_step) is type(second_step)
+    assert first_step.name == "some_function"
+    assert second_step.name == "other_name"
+
+
+def test_step_class_does_not_keep_the_function_alive():
+    """Tests that decorated functions can be garbage collected."""
+
+    def some_function() -> int:
+        return 1
+
+    step_instance = step(some_function)
+    function_ref = weakref.ref(some_function)
+
+    del some_function, step_instance
+    gc.collect()
+
+    assert function_ref() is None
+
+
+def test_decorating_a_function_twice_creates_independent_steps():
+    """Tests that step instances of the same function don't share state."""
+
+    def some_function() -> int:
+        return 1
+
+    first_step = step(some_function)
+    second_step = step(some_function)
+    assert first_step is not second_step
+
+    second_step.configure(enable_cache=False)
+    assert first_step.configuration.enable_cache is None
+    assert second_step.configuration.enable_cache is False